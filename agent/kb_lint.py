@@ -0,0 +1,443 @@
+"""
+Knowledge Base Lint Module
+Finds duplicate, near-duplicate and conflicting questions in the knowledge base.
+
+Usage:
+    python -m agent.kb_lint data/knowledge_base.json --cutoff 0.9
+    python -m agent.kb_lint data/knowledge_base.json --write merged.json
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional
+import logging
+import numpy as np
+from scipy.sparse import csr_matrix
+from .knowledge_base import KnowledgeBase
+from .matcher import QuestionMatcher
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# Tolerance so identical rows reach a cutoff of 1.0 despite rounding
+SCORE_TOLERANCE = 1e-9
+
+
+def _upper_triangle_tiles(matrix: csr_matrix, chunk_size: int, max_nnz: int,
+                          row_limit: Optional[int] = None):
+    """
+    Yield the strict upper triangle of matrix @ matrix.T one tile at a time.
+
+    Rows are processed in blocks of chunk_size, and each block only against
+    itself and later rows. Column tiles are sized so that the number of scalar
+    products in a tile, an upper bound on its nonzeros, stays within max_nnz.
+    Tiles whose rows share no terms with the block are skipped entirely.
+    With row_limit, only pairs whose first row is below row_limit are produced.
+
+    Yields:
+        (rows, cols, values) arrays with rows < cols
+    """
+    num_rows = matrix.shape[0]
+    row_limit = num_rows if row_limit is None else row_limit
+    indicator = matrix.copy()
+    indicator.data = np.ones_like(indicator.data)
+
+    for start in range(0, row_limit, chunk_size):
+        stop = min(start + chunk_size, row_limit)
+        block = matrix[start:stop]
+        term_counts = np.asarray(indicator[start:stop].sum(axis=0)).ravel()
+        # Products each row at or after start contributes against this block
+        cumulative = np.cumsum(indicator[start:] @ term_counts)
+
+        col = start
+        while col < num_rows:
+            done = cumulative[col - start - 1] if col > start else 0.0
+            end = start + int(np.searchsorted(cumulative, done + max_nnz, side='right'))
+            end = min(max(end, col + 1), num_rows)
+            if cumulative[end - start - 1] > done:
+                tile = (block @ matrix[col:end].T).tocoo()
+                rows = tile.row + start
+                cols = tile.col + col
+                keep = cols > rows
+                yield rows[keep], cols[keep], tile.data[keep]
+            col = end
+
+
+def _row_dots(matrix: csr_matrix, rows: np.ndarray, cols: np.ndarray, max_nnz: int) -> np.ndarray:
+    """Return matrix[rows[k]] . matrix[cols[k]] for each k, gathering at most ~max_nnz entries at a time."""
+    row_nnz = np.diff(matrix.indptr)
+    step = max(1, max_nnz // max(1, int(row_nnz.max(initial=0))))
+    dots = np.empty(rows.size)
+    for start in range(0, rows.size, step):
+        left = matrix[rows[start:start + step]]
+        right = matrix[cols[start:start + step]]
+        dots[start:start + step] = np.asarray(left.multiply(right).sum(axis=1)).ravel()
+    return dots
+
+
+def _core_signatures(common_part: csr_matrix, budgets: np.ndarray, max_signatures: int):
+    """
+    Enumerate the cores of each row: its terms minus any subset whose squared
+    weights sum to at most the row's budget.
+
+    Each core is identified by the sum of random 64-bit term hashes, so equal
+    term sets get equal keys. Rows are expanded one dropped term at a time,
+    lightest terms first, which keeps every level vectorized.
+
+    Returns:
+        (rows, keys, norms, overflow): one entry per core with the core's norm,
+        and the rows that have more than max_signatures cores (their cores are
+        left out)
+    """
+    num_rows, num_terms = common_part.shape
+    term_hashes = np.random.default_rng(0).integers(
+        0, np.iinfo(np.uint64).max, size=num_terms, dtype=np.uint64, endpoint=True
+    )
+    row_start, row_end = common_part.indptr[:-1], common_part.indptr[1:]
+    entry_rows = np.repeat(np.arange(num_rows), np.diff(common_part.indptr))
+    squares = common_part.data ** 2
+    order = np.lexsort((squares, entry_rows))
+    squares = squares[order]
+    hashes = term_hashes[common_part.indices[order]]
+    # Sorted search key: row in the integer part, squared weight (<= 1) in the fraction
+    search_keys = entry_rows + squares / 2
+
+    row_norms = np.sqrt(np.bincount(entry_rows, weights=squares, minlength=num_rows))
+    full_keys = np.add.reduceat(hashes, row_start) if squares.size else np.zeros(num_rows, np.uint64)
+    counts = np.ones(num_rows, dtype=np.int64)
+
+    rows, keys, masses = [np.arange(num_rows)], [full_keys], [np.zeros(num_rows)]
+    frontier_rows, frontier_next, frontier_mass, frontier_keys = rows[0], row_start, masses[0], full_keys
+    while frontier_rows.size:
+        # Every later (heavier) term that still fits in the budget extends a core
+        limit = np.searchsorted(search_keys, frontier_rows + (budgets[frontier_rows] - frontier_mass) / 2,
+                                side='right')
+        children = np.maximum(np.minimum(limit, row_end[frontier_rows]) - frontier_next, 0)
+        counts += np.bincount(frontier_rows, weights=children, minlength=num_rows).astype(np.int64)
+        children[counts[frontier_rows] > max_signatures] = 0
+
+        parent = np.repeat(np.arange(frontier_rows.size), children)
+        entry = frontier_next[parent] + np.arange(parent.size) - (np.cumsum(children) - children)[parent]
+        frontier_rows = frontier_rows[parent]
+        frontier_next = entry + 1
+        frontier_mass = frontier_mass[parent] + squares[entry]
+        frontier_keys = frontier_keys[parent] - hashes[entry]
+        rows.append(frontier_rows)
+        keys.append(frontier_keys)
+        masses.append(frontier_mass)
+
+    rows, keys, masses = np.concatenate(rows), np.concatenate(keys), np.concatenate(masses)
+    overflow = counts > max_signatures
+    keep = ~overflow[rows]
+    rows, keys, masses = rows[keep], keys[keep], masses[keep]
+    norms = np.sqrt(np.maximum(row_norms[rows] ** 2 - masses, 0.0))
+    return rows, keys, norms, np.flatnonzero(overflow)
+
+
+def _core_pairs(rows: np.ndarray, keys: np.ndarray, norms: np.ndarray, threshold: float, max_nnz: int):
+    """
+    Yield pairs of rows that share a core whose norms can still reach threshold.
+
+    Yields:
+        (rows, cols) arrays with rows < cols, at most ~max_nnz pairs at a time
+    """
+    if not keys.size:
+        return
+    order = np.lexsort((rows, keys))
+    rows, keys, norms = rows[order], keys[order], norms[order]
+
+    # Drop cores that cannot reach the threshold with any core in their bucket
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    group = np.repeat(np.arange(starts.size), np.diff(np.r_[starts, keys.size]))
+    keep = norms * np.maximum.reduceat(norms, starts)[group] >= threshold
+    rows, keys, norms = rows[keep], keys[keep], norms[keep]
+
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    sizes = np.diff(np.r_[starts, keys.size])
+    group = np.repeat(np.arange(starts.size), sizes)
+    # Each member pairs with every later member of its bucket
+    partners = sizes[group] - 1 - (np.arange(keys.size) - starts[group])
+    ends = np.cumsum(partners)
+
+    member = 0
+    while member < keys.size:
+        stop = max(int(np.searchsorted(ends, ends[member] - partners[member] + max_nnz, side='right')), member + 1)
+        batch = partners[member:stop]
+        first = np.repeat(np.arange(member, stop), batch)
+        second = first + 1 + np.arange(first.size) - np.repeat(np.cumsum(batch) - batch, batch)
+        keep = norms[first] * norms[second] >= threshold
+        first, second = rows[first[keep]], rows[second[keep]]
+        yield np.minimum(first, second), np.maximum(first, second)
+        member = stop
+
+
+def find_near_duplicates(question_vectors, cutoff: float = 0.9, chunk_size: int = 1000,
+                         max_nnz: int = 5_000_000, common_df: Optional[int] = None,
+                         max_signatures: int = 64) -> List[Dict[str, float]]:
+    """
+    Find pairs of rows whose cosine similarity is at least cutoff.
+
+    Terms are split into common (document frequency above common_df) and rare.
+    Pairs sharing a rare term come from the sparse rare-term product, pruned
+    with the bound rare dot + product of common norms and then scored exactly.
+
+    A pair sharing no rare term can only reach the cutoff if the common terms
+    it shares carry at least cutoff**2 of each row's squared norm. Each such
+    "heavy" row therefore lists its cores (common terms minus a subset light
+    enough to be unshared), and only rows with an equal core are compared.
+    Short questions built only from domain words have few cores at high
+    cutoffs, so this stays close to linear. Rows with more than max_signatures
+    cores are compared against every heavy row instead, which is quadratic in
+    their number and logged as a warning.
+
+    Products and candidate batches are capped at max_nnz entries, so memory is
+    bounded by max_nnz, the cores and the result. Rows are assumed
+    L2-normalized (TfidfVectorizer default).
+
+    Args:
+        question_vectors: Sparse (N x V) matrix of normalized question vectors
+        cutoff: Minimum cosine similarity (0.0-1.0) to report
+        chunk_size: Number of rows per block
+        max_nnz: Maximum scalar products (and so nonzeros) per product tile
+        common_df: Document frequency above which a term counts as common
+            (defaults to max(32, sqrt(N)))
+        max_signatures: Maximum cores per heavy row before it falls back to
+            a full comparison
+
+    Returns:
+        List of {'first', 'second', 'score'} dicts with first < second,
+        highest score first
+
+    Raises:
+        ValueError: If cutoff is not between 0 and 1, or chunk_size,
+            max_nnz or max_signatures is not positive
+    """
+    if not 0.0 < cutoff <= 1.0:
+        raise ValueError("Cutoff must be between 0.0 and 1.0")
+    if chunk_size <= 0 or max_nnz <= 0 or max_signatures <= 0:
+        raise ValueError("Chunk size, max_nnz and max_signatures must be positive")
+
+    vectors = csr_matrix(question_vectors, dtype=np.float64)
+    vectors.sum_duplicates()
+    num_rows, num_terms = vectors.shape
+    if common_df is None:
+        common_df = max(32, int(np.sqrt(num_rows)))
+    threshold = cutoff - SCORE_TOLERANCE
+
+    # Split every row into its common-term and rare-term parts
+    document_frequency = np.bincount(vectors.indices, minlength=num_terms)
+    is_common = (document_frequency > common_df)[vectors.indices]
+    common_part = vectors.copy()
+    common_part.data = np.where(is_common, vectors.data, 0.0)
+    common_part.eliminate_zeros()
+    rare_part = vectors.copy()
+    rare_part.data = np.where(is_common, 0.0, vectors.data)
+    rare_part.eliminate_zeros()
+    common_norms = np.sqrt(np.asarray(common_part.multiply(common_part).sum(axis=1)).ravel())
+
+    firsts, seconds, scores = [], [], []
+
+    # Pairs sharing at least one rare term
+    for rows, cols, rare_dot in _upper_triangle_tiles(rare_part, chunk_size, max_nnz):
+        keep = rare_dot + common_norms[rows] * common_norms[cols] >= threshold
+        rows, cols, rare_dot = rows[keep], cols[keep], rare_dot[keep]
+        if not rows.size:
+            continue
+        pair_scores = rare_dot + _row_dots(common_part, rows, cols, max_nnz)
+        hit = pair_scores >= threshold
+        firsts.append(rows[hit])
+        seconds.append(cols[hit])
+        scores.append(pair_scores[hit])
+
+    # Pairs that can reach the cutoff through common terms alone
+    heavy = np.flatnonzero(common_norms >= threshold)
+    if heavy.size > 1:
+        # Slack keeps rounding from dropping a core exactly at the budget
+        budgets = common_norms[heavy] ** 2 - threshold ** 2 + 1e-6
+        rows, keys, norms, overflow = _core_signatures(common_part[heavy], budgets, max_signatures)
+        for rows, cols in _core_pairs(rows, keys, norms, threshold, max_nnz):
+            rows, cols = heavy[rows], heavy[cols]
+            pair_scores = _row_dots(vectors, rows, cols, max_nnz)
+            hit = pair_scores >= threshold
+            firsts.append(rows[hit])
+            seconds.append(cols[hit])
+            scores.append(pair_scores[hit])
+
+        if overflow.size:
+            logger.warning(f"{overflow.size} of {heavy.size} common-term rows have more than "
+                           f"{max_signatures} cores; comparing them against all common-term rows")
+            # Overflow rows first, so tiles limited to them cover every pair they are in
+            order = heavy[np.r_[overflow, np.setdiff1d(np.arange(heavy.size), overflow)]]
+            for rows, cols, pair_scores in _upper_triangle_tiles(vectors[order], chunk_size, max_nnz,
+                                                                 row_limit=overflow.size):
+                hit = pair_scores >= threshold
+                rows, cols = order[rows[hit]], order[cols[hit]]
+                firsts.append(np.minimum(rows, cols))
+                seconds.append(np.maximum(rows, cols))
+                scores.append(pair_scores[hit])
+
+    if not firsts:
+        return []
+
+    firsts = np.concatenate(firsts)
+    seconds = np.concatenate(seconds)
+    scores = np.minimum(np.concatenate(scores), 1.0)
+
+    # A pair can be found by more than one pass or core
+    _, unique = np.unique(firsts.astype(np.int64) * num_rows + seconds, return_index=True)
+    firsts, seconds, scores = firsts[unique], seconds[unique], scores[unique]
+
+    order = np.lexsort((seconds, firsts, -scores))
+    return [
+        {'first': int(firsts[k]), 'second': int(seconds[k]), 'score': float(scores[k])}
+        for k in order
+    ]
+
+
+def lint_knowledge_base(matcher: QuestionMatcher, cutoff: float = 0.9,
+                        chunk_size: int = 1000, max_nnz: int = 5_000_000) -> Dict[str, list]:
+    """
+    Analyze a fitted matcher's questions for duplicates and conflicts.
+
+    Args:
+        matcher: Fitted QuestionMatcher (its normalizer and vectors are reused)
+        cutoff: Minimum cosine similarity for near-duplicates
+        chunk_size: Rows per similarity block
+        max_nnz: Maximum scalar products per similarity tile
+
+    Returns:
+        Dictionary containing:
+            - 'duplicates': Groups of indices whose normalized text is identical
+              and whose answers agree; only the first is reachable by exact match
+            - 'conflicts': Groups of indices with identical normalized text but
+              different answers
+            - 'near_duplicates': Pairs of different text above the cutoff, each
+              with 'first', 'second', 'score' and 'same_answer'
+    """
+    questions, answers = matcher.questions, matcher.answers
+
+    groups: Dict[str, List[int]] = {}
+    for i, question in enumerate(questions):
+        groups.setdefault(matcher.normalizer.normalize(question), []).append(i)
+
+    duplicates, conflicts = [], []
+    group_of = {}
+    for key, indices in groups.items():
+        if len(indices) < 2:
+            continue
+        for i in indices:
+            group_of[i] = key
+        if len({answers[i] for i in indices}) == 1:
+            duplicates.append(indices)
+        else:
+            conflicts.append(indices)
+
+    near_duplicates = []
+    for pair in find_near_duplicates(matcher.question_vectors, cutoff, chunk_size, max_nnz):
+        first, second = pair['first'], pair['second']
+        if first in group_of and group_of.get(second) == group_of[first]:
+            continue
+        pair['same_answer'] = answers[first] == answers[second]
+        near_duplicates.append(pair)
+
+    logger.info(f"KB lint: {len(duplicates)} duplicate groups, {len(conflicts)} conflicts, "
+                f"{len(near_duplicates)} near-duplicate pairs (cutoff={cutoff})")
+    return {
+        'duplicates': duplicates,
+        'conflicts': conflicts,
+        'near_duplicates': near_duplicates
+    }
+
+
+def merge_duplicates(qa_pairs: List[Dict[str, str]], report: Dict[str, list]) -> List[Dict[str, str]]:
+    """
+    Drop duplicates and same-answer near-duplicates, keeping the first entry.
+
+    Conflicting entries are left untouched for a human to resolve.
+
+    Args:
+        qa_pairs: Question-answer pairs the report was computed from
+        report: Output of lint_knowledge_base()
+
+    Returns:
+        New list of question-answer pairs in original order
+    """
+    parent = list(range(len(qa_pairs)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i: int, j: int) -> None:
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    for indices in report['duplicates']:
+        for i in indices[1:]:
+            union(indices[0], i)
+    for pair in report['near_duplicates']:
+        if pair['same_answer']:
+            union(pair['first'], pair['second'])
+
+    return [qa for i, qa in enumerate(qa_pairs) if find(i) == i]
+
+
+def format_report(report: Dict[str, list], questions: List[str]) -> str:
+    """Format a lint report as human-readable text."""
+    lines = []
+    for indices in report['conflicts']:
+        lines.append("CONFLICT (same question, different answers):")
+        lines.extend(f"  [{i}] {questions[i]}" for i in indices)
+    for indices in report['duplicates']:
+        lines.append("DUPLICATE:")
+        lines.extend(f"  [{i}] {questions[i]}" for i in indices)
+    for pair in report['near_duplicates']:
+        label = "NEAR-DUPLICATE" if pair['same_answer'] else "AMBIGUOUS (different answers)"
+        lines.append(f"{label} score={pair['score']:.3f}:")
+        lines.append(f"  [{pair['first']}] {questions[pair['first']]}")
+        lines.append(f"  [{pair['second']}] {questions[pair['second']]}")
+    if not lines:
+        lines.append("No duplicates or conflicts found.")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Lint a knowledge base for duplicate questions")
+    parser.add_argument('kb_path', help="Knowledge base JSON path")
+    parser.add_argument('--cutoff', type=float, default=0.9, help="Near-duplicate similarity cutoff")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="Rows per similarity block")
+    parser.add_argument('--max-nnz', type=int, default=5_000_000,
+                        help="Maximum scalar products per similarity tile (bounds memory)")
+    parser.add_argument('--write', help="Write a merged knowledge base to this path")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    kb = KnowledgeBase(args.kb_path)
+    qa_pairs = kb.get_qa_pairs()
+    questions = [qa['question'] for qa in qa_pairs]
+    matcher = QuestionMatcher(questions, [qa['answer'] for qa in qa_pairs], synonyms=kb.get_synonyms())
+    report = lint_knowledge_base(matcher, args.cutoff, args.chunk_size, args.max_nnz)
+
+    print(json.dumps(report, indent=2) if args.json else format_report(report, questions))
+
+    if args.write:
+        with open(args.kb_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        data['questions'] = merge_duplicates(qa_pairs, report)
+        with open(args.write, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+            f.write("\n")
+        logger.info(f"Wrote {len(data['questions'])} of {len(qa_pairs)} questions to {args.write}")
+
+    return 1 if report['conflicts'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -29,6 +29,7 @@ class KnowledgeBase:
         """
         self.kb_path = kb_path
         self.questions: List[Dict[str, str]] = []
+        self.synonyms: Dict[str, List[str]] = {}
         self._load_knowledge_base()
 
     def _load_knowledge_base(self) -> None:
@@ -41,6 +42,7 @@ class KnowledgeBase:
                 data = json.load(f)
 
             self.questions = data.get('questions', [])
+            self.synonyms = data.get('synonyms', {})
 
             if not self.questions:
                 logger.warning("Knowledge base loaded but contains no questions")
@@ -90,6 +92,15 @@ class KnowledgeBase:
         """
         return self.questions
 
+    def get_synonyms(self) -> Dict[str, List[str]]:
+        """
+        Get the synonym and acronym table.
+
+        Returns:
+            Dictionary mapping each canonical term to its list of aliases
+        """
+        return self.synonyms
+
     def __len__(self) -> int:
         """Return the number of Q&A pairs in the knowledge base."""
         return len(self.questions)
@@ -3,11 +3,12 @@ Question Matcher Module
 Implements intelligent question matching using TF-IDF and cosine similarity.
 """
 
-from typing import Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 import logging
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
+from .synonyms import SynonymNormalizer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -19,7 +20,8 @@ class QuestionMatcher:
     Matches user questions to predefined questions using TF-IDF and cosine similarity.
     """
 
-    def __init__(self, questions: list, answers: list, threshold: float = 0.6):
+    def __init__(self, questions: list, answers: list, threshold: float = 0.6,
+                 synonyms: Optional[Dict[str, List[str]]] = None):
         """
         Initialize the question matcher.
 
@@ -27,6 +29,8 @@ class QuestionMatcher:
             questions: List of predefined questions
             answers: List of corresponding answers
             threshold: Similarity threshold (0.0-1.0) for matching confidence
+            synonyms: Optional mapping of canonical term to aliases (e.g. 'eva' to
+                ['eligibility verification agent']), applied to questions and queries
 
         Raises:
             ValueError: If questions and answers lists don't match in length
@@ -40,11 +44,21 @@ class QuestionMatcher:
         self.questions = questions
         self.answers = answers
         self.threshold = threshold
+        self.normalizer = SynonymNormalizer(synonyms)
         self.vectorizer = TfidfVectorizer(lowercase=True, stop_words='english')
 
+        # Normalize once at index time; the first occurrence wins on exact-match collisions
+        normalized_questions = [self.normalizer.normalize(q) for q in questions]
+        self.exact_index: Dict[str, int] = {}
+        for i, normalized in enumerate(normalized_questions):
+            self.exact_index.setdefault(normalized, i)
+
         try:
-            # Fit vectorizer on predefined questions
-            self.question_vectors = self.vectorizer.fit_transform(questions)
+            # Fit vectorizer on normalized predefined questions
+            self.question_vectors = self.vectorizer.fit_transform(normalized_questions)
+
+            # Cheap out-of-scope rejection: queries with no fitted term can only score 0
+            self.analyzer = self.vectorizer.build_analyzer()
             logger.info(f"Initialized matcher with {len(questions)} questions, threshold={threshold}")
         except Exception as e:
             logger.error(f"Error initializing TF-IDF vectorizer: {e}")
@@ -66,15 +80,21 @@ class QuestionMatcher:
             return None, 0.0, None
 
         try:
-            # First try exact match (case-insensitive) for perfect accuracy
-            user_question_lower = user_question.lower().strip()
-            for i, question in enumerate(self.questions):
-                if question.lower().strip() == user_question_lower:
-                    logger.info(f"Exact match found: '{question}'")
-                    return self.answers[i], 1.0, question
+            # First try exact match (case-insensitive, synonym-normalized) for perfect accuracy
+            normalized_question = self.normalizer.normalize(user_question)
+            exact_idx = self.exact_index.get(normalized_question)
+            if exact_idx is not None:
+                question = self.questions[exact_idx]
+                logger.info(f"Exact match found: '{question}'")
+                return self.answers[exact_idx], 1.0, question
+
+            # Skip vectorization entirely when no query term is in the vocabulary
+            if not self.has_known_terms(normalized_question):
+                logger.debug("No in-vocabulary terms, skipping similarity scan")
+                return None, 0.0, None
 
             # If no exact match, use TF-IDF similarity
-            user_vector = self.vectorizer.transform([user_question])
+            user_vector = self.vectorizer.transform([normalized_question])
             similarities = cosine_similarity(user_vector, self.question_vectors)[0]
 
             # Find the highest similarity score
@@ -94,6 +114,19 @@ class QuestionMatcher:
             logger.error(f"Error in question matching: {e}")
             return None, 0.0, None
 
+    def has_known_terms(self, text: str) -> bool:
+        """
+        Check whether any analyzed term of the text is in the fitted vocabulary.
+
+        Args:
+            text: Synonym-normalized question text
+
+        Returns:
+            False if the text can only score 0 against every question
+        """
+        vocabulary = self.vectorizer.vocabulary_
+        return any(term in vocabulary for term in self.analyzer(text))
+
     def get_all_questions(self) -> list:
         """Return all predefined questions."""
         return self.questions.copy()
@@ -0,0 +1,245 @@
+"""
+Request Profiler Module
+Opt-in profiling of individual responder calls, aggregated as folded stacks.
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+Stack = Tuple[str, ...]
+
+
+def _frame_name(frame) -> str:
+    """Return a 'file.py:Qualified.name' label for a Python frame."""
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def _builtin_name(func) -> str:
+    """Return a label for a C function seen by the profile hook."""
+    module = getattr(func, '__module__', None) or 'built-in'
+    return f"{module}:{getattr(func, '__qualname__', repr(func))}"
+
+
+class RequestProfiler:
+    """
+    Profiles a sampled fraction of requests, or any request slower than a
+    latency threshold, and aggregates the results as folded stacks
+    ("a;b;c <microseconds>") that flamegraph.pl and speedscope can read.
+
+    Sampled requests are traced deterministically in their own thread with
+    sys.setprofile. Threshold profiling uses a background thread that samples
+    the stacks of in-flight requests and keeps them only for slow requests.
+    The same background thread writes the periodic dumps, so request threads
+    never pay for formatting or file I/O.
+    """
+
+    def __init__(self, sample_rate: float = 0.0, latency_threshold_ms: Optional[float] = None,
+                 sample_interval_ms: float = 1.0, output_path: Optional[str] = None,
+                 dump_interval_s: float = 60.0):
+        """
+        Initialize the profiler.
+
+        Args:
+            sample_rate: Fraction of requests (0.0-1.0) to trace
+            latency_threshold_ms: Keep stack samples for requests at least this slow
+            sample_interval_ms: Stack sampling interval for threshold profiling
+            output_path: Folded-stack file rewritten with the running aggregate
+            dump_interval_s: Minimum seconds between automatic dumps
+
+        Raises:
+            ValueError: If sample_rate is not between 0 and 1
+        """
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("Sample rate must be between 0.0 and 1.0")
+
+        self.sample_rate = sample_rate
+        self.latency_threshold_ms = latency_threshold_ms
+        self.sample_interval_ms = sample_interval_ms
+        self.output_path = output_path
+        self.dump_interval_s = dump_interval_s
+
+        self.stacks: Counter = Counter()
+        self.profiled_requests = 0
+        self._lock = threading.Lock()
+        self._dump_lock = threading.Lock()
+        self._last_dump = time.monotonic()
+
+        # Thread id -> (root frame, collected samples) for in-flight requests
+        self._inflight: Dict[int, Tuple[Any, List[Stack]]] = {}
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        if latency_threshold_ms is not None or output_path:
+            self._worker = threading.Thread(target=self._background_loop, name="request-profiler", daemon=True)
+            self._worker.start()
+
+        logger.info(f"Request profiler enabled: sample_rate={sample_rate}, "
+                    f"latency_threshold_ms={latency_threshold_ms}, output={output_path}")
+
+    @classmethod
+    def from_env(cls) -> Optional["RequestProfiler"]:
+        """
+        Build a profiler from AGENT_PROFILE_* environment variables.
+
+        Reads AGENT_PROFILE_SAMPLE_RATE, AGENT_PROFILE_LATENCY_MS,
+        AGENT_PROFILE_OUTPUT and AGENT_PROFILE_DUMP_INTERVAL.
+
+        Returns:
+            A configured profiler, or None if neither sampling nor a latency
+            threshold is requested
+        """
+        sample_rate = float(os.environ.get('AGENT_PROFILE_SAMPLE_RATE', 0) or 0)
+        latency = os.environ.get('AGENT_PROFILE_LATENCY_MS')
+        if sample_rate <= 0 and not latency:
+            return None
+        return cls(
+            sample_rate=sample_rate,
+            latency_threshold_ms=float(latency) if latency else None,
+            output_path=os.environ.get('AGENT_PROFILE_OUTPUT', 'responder.folded'),
+            dump_interval_s=float(os.environ.get('AGENT_PROFILE_DUMP_INTERVAL', 60))
+        )
+
+    def call(self, func: Callable, *args, **kwargs):
+        """
+        Run func, profiling it if it is sampled or turns out to be slow.
+
+        Args:
+            func: Function to run
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            Whatever func returns
+        """
+        if self.sample_rate and random.random() < self.sample_rate:
+            return self._trace(func, args, kwargs)
+        if self.latency_threshold_ms is not None:
+            return self._watch(func, args, kwargs)
+        return func(*args, **kwargs)
+
+    def _trace(self, func: Callable, args: tuple, kwargs: dict):
+        """Run func under a per-thread profile hook, recording self time per stack."""
+        counts: Counter = Counter()
+        path: List[str] = []
+        last = time.perf_counter_ns()
+
+        def hook(frame, event, arg):
+            nonlocal last
+            now = time.perf_counter_ns()
+            if path:
+                counts[tuple(path)] += now - last
+            if event == 'call':
+                path.append(_frame_name(frame))
+            elif event == 'c_call':
+                path.append(_builtin_name(arg))
+            elif path:
+                path.pop()
+            last = time.perf_counter_ns()
+
+        previous = sys.getprofile()
+        sys.setprofile(hook)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            sys.setprofile(previous)
+            self._record({stack: ns / 1000.0 for stack, ns in counts.items()})
+
+    def _watch(self, func: Callable, args: tuple, kwargs: dict):
+        """Run func while the sampler thread collects its stacks."""
+        thread_id = threading.get_ident()
+        samples: List[Stack] = []
+        self._inflight[thread_id] = (sys._getframe(), samples)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            del self._inflight[thread_id]
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if elapsed_ms >= self.latency_threshold_ms and samples:
+                logger.info(f"Slow request ({elapsed_ms:.1f}ms), kept {len(samples)} stack samples")
+                weight = self.sample_interval_ms * 1000
+                self._record(Counter({stack: count * weight for stack, count in Counter(samples).items()}))
+
+    def _background_loop(self) -> None:
+        """Sample in-flight requests (threshold mode) and write periodic dumps."""
+        if self.latency_threshold_ms is not None:
+            interval = self.sample_interval_ms / 1000.0
+        else:
+            interval = min(self.dump_interval_s, 1.0)
+        while not self._stop.wait(interval):
+            if self._inflight:
+                self._sample_inflight()
+            if self.output_path and time.monotonic() - self._last_dump >= self.dump_interval_s:
+                self.dump()
+
+    def _sample_inflight(self) -> None:
+        """Capture the stacks of all in-flight requests."""
+        frames = sys._current_frames()
+        for thread_id, (root, samples) in list(self._inflight.items()):
+            frame = frames.get(thread_id)
+            stack = []
+            while frame is not None and frame is not root:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                samples.append(tuple(reversed(stack)))
+
+    def _record(self, stacks: Dict[Stack, float]) -> None:
+        """Merge one request's stacks into the aggregate."""
+        with self._lock:
+            self.stacks.update(stacks)
+            self.profiled_requests += 1
+
+    def folded(self) -> str:
+        """
+        Render the aggregate as folded stacks.
+
+        Returns:
+            One "frame;frame;frame microseconds" line per distinct stack
+        """
+        with self._lock:
+            snapshot = list(self.stacks.items())
+        items = sorted(snapshot)
+        return "".join(
+            f"{';'.join(stack)} {int(round(us))}\n" for stack, us in items if round(us) > 0
+        )
+
+    def dump(self, path: Optional[str] = None) -> Optional[str]:
+        """
+        Write the aggregate folded stacks to disk.
+
+        Args:
+            path: Destination file (defaults to output_path)
+
+        Returns:
+            The path written, or None if there is no destination
+        """
+        path = path or self.output_path
+        self._last_dump = time.monotonic()
+        if not path:
+            return None
+        with self._dump_lock:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(self.folded())
+            os.replace(tmp_path, path)
+        logger.info(f"Wrote profile for {self.profiled_requests} requests to {path}")
+        return path
+
+    def close(self) -> None:
+        """Stop the background thread and write a final dump."""
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join()
+        if self.output_path:
+            self.dump()
@@ -6,7 +6,10 @@ Handles response generation with fallback logic for out-of-scope questions.
 from typing import Dict, List, Optional
 import logging
 from .matcher import QuestionMatcher
+from .kb_lint import lint_knowledge_base
 from .knowledge_base import KnowledgeBase
+from .profiler import RequestProfiler
+from .suggester import SuggestionIndex
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -19,16 +22,21 @@ class ThoughtfulAIResponder:
     Uses predefined answers for known questions and fallback responses otherwise.
     """
 
-    def __init__(self, knowledge_base: KnowledgeBase, similarity_threshold: float = 0.6):
+    def __init__(self, knowledge_base: KnowledgeBase, similarity_threshold: float = 0.6,
+                 profiler: Optional[RequestProfiler] = None, lint_cutoff: Optional[float] = None):
         """
         Initialize the responder.
 
         Args:
             knowledge_base: KnowledgeBase instance with Q&A pairs
             similarity_threshold: Threshold for question matching (0.0-1.0)
+            profiler: Optional RequestProfiler wrapped around get_response calls
+            lint_cutoff: If set, check the KB for duplicates and conflicts at load
+                time, treating questions at least this similar as near-duplicates
         """
         self.kb = knowledge_base
         self.threshold = similarity_threshold
+        self.profiler = profiler
 
         # Extract questions and answers
         qa_pairs = self.kb.get_qa_pairs()
@@ -36,7 +44,26 @@ class ThoughtfulAIResponder:
         answers = [qa['answer'] for qa in qa_pairs]
 
         # Initialize matcher
-        self.matcher = QuestionMatcher(questions, answers, threshold=similarity_threshold)
+        self.matcher = QuestionMatcher(
+            questions, answers,
+            threshold=similarity_threshold,
+            synonyms=self.kb.get_synonyms()
+        )
+
+        # Optional load-time KB lint; argmax silently prefers the first of tied rows
+        self.lint_report = None
+        if lint_cutoff is not None:
+            self.lint_report = lint_knowledge_base(self.matcher, cutoff=lint_cutoff)
+            for indices in self.lint_report['conflicts']:
+                logger.warning(f"Conflicting answers for question: '{questions[indices[0]]}'")
+            ambiguous = [p for p in self.lint_report['near_duplicates'] if not p['same_answer']]
+            if ambiguous:
+                logger.warning(f"{len(ambiguous)} near-duplicate question pairs have different answers")
+
+        # Typeahead index, seeded with optional per-entry 'popularity' counts
+        self.suggester = SuggestionIndex(
+            questions, [qa.get('popularity', 0) for qa in qa_pairs]
+        )
 
         # Fallback responses for different scenarios
         self.fallback_responses = {
@@ -50,6 +77,11 @@ class ThoughtfulAIResponder:
             'error': "I encountered an error processing your question. Please try again or rephrase your question."
         }
 
+        # The no-match fallback only depends on the KB, so format it once
+        self.no_match_response = self.fallback_responses['no_match'].format(
+            sample_questions=self._get_sample_questions(num_samples=3)
+        )
+
         logger.info(f"ThoughtfulAIResponder initialized with {len(questions)} Q&A pairs")
 
     def get_response(self, user_question: str) -> Dict[str, any]:
@@ -66,6 +98,12 @@ class ThoughtfulAIResponder:
                 - 'matched_question': The matched question if found
                 - 'source': 'predefined' or 'fallback'
         """
+        if self.profiler is not None:
+            return self.profiler.call(self._generate_response, user_question)
+        return self._generate_response(user_question)
+
+    def _generate_response(self, user_question: str) -> Dict[str, any]:
+        """Build the response dictionary described in get_response()."""
         # Handle empty input
         if not user_question or not user_question.strip():
             logger.warning("Empty question received")
@@ -92,6 +130,7 @@ class ThoughtfulAIResponder:
             if answer:
                 # Found a good match
                 logger.info(f"Returning predefined answer with confidence {confidence:.3f}")
+                self.suggester.record_hit(matched_question)
                 return {
                     'answer': answer,
                     'confidence': confidence,
@@ -101,12 +140,8 @@ class ThoughtfulAIResponder:
             else:
                 # No good match found - use fallback
                 logger.info(f"No match found (confidence: {confidence:.3f}), using fallback")
-                sample_questions = self._get_sample_questions(num_samples=3)
-                fallback_answer = self.fallback_responses['no_match'].format(
-                    sample_questions=sample_questions
-                )
                 return {
-                    'answer': fallback_answer,
+                    'answer': self.no_match_response,
                     'confidence': confidence,
                     'matched_question': None,
                     'source': 'fallback'
@@ -144,6 +179,19 @@ class ThoughtfulAIResponder:
         """
         return self.matcher.get_all_questions()
 
+    def suggest(self, prefix: str, k: int = 5) -> List[str]:
+        """
+        Suggest predefined questions for a partially typed question.
+
+        Args:
+            prefix: Text typed so far
+            k: Maximum number of suggestions
+
+        Returns:
+            List of predefined questions ranked by prefix match and popularity
+        """
+        return self.suggester.suggest(prefix, k)
+
     def update_threshold(self, new_threshold: float) -> None:
         """
         Update the similarity matching threshold.
@@ -0,0 +1,331 @@
+"""
+Suggestion Index Module
+Popularity-ranked prefix and token-prefix typeahead over knowledge base questions.
+"""
+
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from heapq import heappop, heappush
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import logging
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+def _normalize(text: str) -> str:
+    """Lowercase text and collapse runs of whitespace."""
+    return " ".join(text.lower().split())
+
+
+def _intersect(a: np.ndarray, b: np.ndarray, size: int) -> np.ndarray:
+    """
+    Intersect two sorted qid arrays in [0, size).
+
+    A much shorter array is binary-searched into the longer one; lists of
+    similar length are intersected through a membership mask, which avoids
+    the cache misses of searching every element.
+    """
+    if len(a) > len(b):
+        a, b = b, a
+    if not len(a):
+        return a
+    if len(b) > 32 * len(a):
+        idx = np.minimum(np.searchsorted(b, a), len(b) - 1)
+        return a[b[idx] == a]
+    mask = np.zeros(size, dtype=bool)
+    mask[b] = True
+    return a[mask[a]]
+
+
+class _RangeTopK:
+    """
+    Segment tree over a sorted key array that yields the entries of any
+    contiguous range in descending popularity order.
+    """
+
+    def __init__(self, qids: List[int], popularity: List[float]):
+        """
+        Build the tree.
+
+        Args:
+            qids: Question id for each position of the sorted key array
+            popularity: Shared popularity list indexed by question id
+        """
+        self.qids = qids
+        self.popularity = popularity
+        self.size = 1
+        while self.size < max(1, len(qids)):
+            self.size *= 2
+        self.tree = [-1] * (2 * self.size)
+        self.tree[self.size:self.size + len(qids)] = range(len(qids))
+        for node in range(self.size - 1, 0, -1):
+            self.tree[node] = self._better(self.tree[2 * node], self.tree[2 * node + 1])
+
+        self.positions: Dict[int, List[int]] = {}
+        for pos, qid in enumerate(qids):
+            self.positions.setdefault(qid, []).append(pos)
+
+    def _better(self, a: int, b: int) -> int:
+        """Return the more popular of two positions; ties go to the earlier one."""
+        if a < 0:
+            return b
+        if b < 0:
+            return a
+        pa = self.popularity[self.qids[a]]
+        pb = self.popularity[self.qids[b]]
+        if pb > pa or (pb == pa and b < a):
+            return b
+        return a
+
+    def refresh(self, qid: int) -> None:
+        """Propagate a popularity change for one question up the tree."""
+        for pos in self.positions.get(qid, ()):
+            node = (pos + self.size) // 2
+            while node:
+                self.tree[node] = self._better(self.tree[2 * node], self.tree[2 * node + 1])
+                node //= 2
+
+    def argmax(self, lo: int, hi: int) -> int:
+        """Return the most popular position in [lo, hi), or -1 if empty."""
+        best = -1
+        lo += self.size
+        hi += self.size
+        while lo < hi:
+            if lo & 1:
+                best = self._better(best, self.tree[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                best = self._better(best, self.tree[hi])
+            lo //= 2
+            hi //= 2
+        return best
+
+    def iter_ranked(self, lo: int, hi: int) -> Iterator[int]:
+        """Yield positions in [lo, hi) from most to least popular."""
+        heap: List[Tuple[float, int, int, int]] = []
+
+        def push(start: int, end: int) -> None:
+            if start < end:
+                pos = self.argmax(start, end)
+                heappush(heap, (-self.popularity[self.qids[pos]], pos, start, end))
+
+        push(lo, hi)
+        while heap:
+            _, pos, start, end = heappop(heap)
+            yield pos
+            push(start, pos)
+            push(pos + 1, end)
+
+
+class SuggestionIndex:
+    """
+    Typeahead index over questions using sorted arrays and binary search.
+
+    Whole-question prefix matches are returned first, then questions containing
+    every earlier typed word and a word that starts with the last one. Both are
+    ranked by popularity. The token array doubles as per-token posting lists:
+    each token's entries are contiguous and sorted by question id.
+    """
+
+    def __init__(self, questions: List[str], popularity: Optional[List[float]] = None):
+        """
+        Build the suggestion index.
+
+        Args:
+            questions: Questions to suggest
+            popularity: Optional initial popularity per question (defaults to 0)
+
+        Raises:
+            ValueError: If popularity and questions lists don't match in length
+        """
+        if popularity is not None and len(popularity) != len(questions):
+            raise ValueError("Popularity and questions must have the same length")
+
+        self.questions: List[str] = []
+        self.popularity: List[float] = []
+        self.question_ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        for i, question in enumerate(questions):
+            key = _normalize(question)
+            weight = float(popularity[i]) if popularity is not None else 0.0
+            qid = self.question_ids.get(key)
+            if qid is None:
+                self.question_ids[key] = len(self.questions)
+                self.questions.append(question)
+                self.popularity.append(weight)
+            else:
+                self.popularity[qid] += weight
+
+        # Whole-question prefix array
+        full = sorted((key, qid) for key, qid in self.question_ids.items())
+        self.full_keys = [key for key, _ in full]
+        self.full_ranked = _RangeTopK([qid for _, qid in full], self.popularity)
+
+        # Token-prefix array: one entry per distinct (token, question) pair
+        tokens = sorted({
+            (token, qid)
+            for key, qid in self.question_ids.items()
+            for token in TOKEN_PATTERN.findall(key)
+        })
+        self.token_keys = [token for token, _ in tokens]
+        self.token_ranked = _RangeTopK([qid for _, qid in tokens], self.popularity)
+        self.token_qids = np.array(self.token_ranked.qids, dtype=np.int64)
+        self.popularity_array = np.array(self.popularity, dtype=float)
+
+        self.question_tokens = [set(TOKEN_PATTERN.findall(_normalize(q))) for q in self.questions]
+
+        logger.info(f"Built suggestion index with {len(self.questions)} questions, "
+                    f"{len(self.token_keys)} token entries")
+
+    @staticmethod
+    def _prefix_range(keys: List[str], prefix: str) -> Tuple[int, int]:
+        """Return the [lo, hi) range of sorted keys starting with prefix."""
+        lo = bisect_left(keys, prefix)
+        hi = bisect_left(keys, prefix + "\U0010ffff", lo)
+        return lo, hi
+
+    def suggest(self, prefix: str, k: int = 5) -> List[str]:
+        """
+        Suggest up to k questions for a typed prefix.
+
+        Args:
+            prefix: Text typed so far; an empty prefix returns the most popular questions
+            k: Maximum number of suggestions
+
+        Returns:
+            List of question strings, most relevant first
+        """
+        if k <= 0:
+            return []
+
+        prefix = _normalize(prefix)
+        results: List[int] = []
+        seen = set()
+
+        lo, hi = self._prefix_range(self.full_keys, prefix)
+        for pos in self.full_ranked.iter_ranked(lo, hi):
+            qid = self.full_ranked.qids[pos]
+            results.append(qid)
+            seen.add(qid)
+            if len(results) >= k:
+                return [self.questions[qid] for qid in results]
+
+        words = TOKEN_PATTERN.findall(prefix)
+        if words:
+            # Earlier words must appear in full; the last word may be partial.
+            # Walk the smallest candidate range in popularity order, which stops
+            # after k hits when most candidates match. Fall back to intersecting
+            # posting lists when the filter turns out to be selective.
+            required = set(words[:-1])
+            last = words[-1]
+            prefix_range = self._prefix_range(self.token_keys, last)
+            word_ranges = sorted((self._word_range(word) for word in required), key=lambda r: r[1] - r[0])
+            lo, hi = prefix_range
+            accept = lambda qid: required <= self.question_tokens[qid]
+            if word_ranges and word_ranges[0][1] - word_ranges[0][0] < hi - lo:
+                lo, hi = word_ranges[0]
+                accept = lambda qid: required <= self.question_tokens[qid] and any(
+                    token.startswith(last) for token in self.question_tokens[qid]
+                )
+            if not self._walk_ranked(self.token_ranked, lo, hi, accept, k, results, seen):
+                candidates = self._matching_qids(word_ranges, prefix_range)
+                self._take_most_popular(candidates, k, results, seen)
+
+        return [self.questions[qid] for qid in results]
+
+    def _word_range(self, word: str) -> Tuple[int, int]:
+        """Return the [lo, hi) token range holding the posting list of one exact word."""
+        lo = bisect_left(self.token_keys, word)
+        return lo, bisect_right(self.token_keys, word, lo)
+
+    @staticmethod
+    def _walk_ranked(ranked: _RangeTopK, lo: int, hi: int, accept: Callable[[int], bool],
+                     k: int, results: List[int], seen: set) -> bool:
+        """
+        Append accepted questions from [lo, hi) in popularity order until results holds k.
+
+        Returns:
+            False if a bounded number of probes ran out first, meaning the
+            filter is selective and the caller should intersect instead
+        """
+        probes = 0
+        for pos in ranked.iter_ranked(lo, hi):
+            qid = ranked.qids[pos]
+            if qid not in seen and accept(qid):
+                results.append(qid)
+                seen.add(qid)
+                if len(results) >= k:
+                    return True
+            probes += 1
+            if probes >= 4 * k + 32:
+                return False
+        return True
+
+    def _matching_qids(self, word_ranges: List[Tuple[int, int]], prefix_range: Tuple[int, int]) -> np.ndarray:
+        """
+        Return the sorted ids of questions containing every completed word and a
+        word in prefix_range.
+
+        Posting lists are intersected starting from the rarest word, and the
+        last-word prefix range (not sorted by id) is applied as a mask.
+        """
+        prefix_lo, prefix_hi = prefix_range
+        mask = np.zeros(len(self.questions), dtype=bool)
+        mask[self.token_qids[prefix_lo:prefix_hi]] = True
+        if not word_ranges:
+            return np.flatnonzero(mask)
+
+        lo, hi = word_ranges[0]
+        candidates = self.token_qids[lo:hi]
+        candidates = candidates[mask[candidates]]
+        for lo, hi in word_ranges[1:]:
+            if not len(candidates):
+                break
+            candidates = _intersect(candidates, self.token_qids[lo:hi], len(self.questions))
+        return candidates
+
+    def _take_most_popular(self, candidates: np.ndarray, k: int, results: List[int], seen: set) -> None:
+        """Append the most popular unseen candidates (ties by id) until results holds k."""
+        if seen:
+            candidates = candidates[~np.isin(candidates, list(seen))]
+        need = k - len(results)
+        popularity = self.popularity_array[candidates]
+        if len(candidates) > need:
+            # Partition around the need-th largest popularity; ties keep the lowest ids
+            cut = -np.partition(-popularity, need - 1)[need - 1]
+            above = candidates[popularity > cut]
+            candidates = np.concatenate((above, candidates[popularity == cut][:need - len(above)]))
+            popularity = self.popularity_array[candidates]
+        order = np.lexsort((candidates, -popularity))
+        chosen = candidates[order[:need]].tolist()
+        results.extend(chosen)
+        seen.update(chosen)
+
+    def record_hit(self, question: str, weight: float = 1.0) -> None:
+        """
+        Increase the popularity of a question.
+
+        Args:
+            question: Question text (matched case- and whitespace-insensitively)
+            weight: Amount to add to its popularity
+        """
+        qid = self.question_ids.get(_normalize(question))
+        if qid is None:
+            return
+        with self._lock:
+            self.popularity[qid] += weight
+            self.popularity_array[qid] = self.popularity[qid]
+            self.full_ranked.refresh(qid)
+            self.token_ranked.refresh(qid)
+
+    def __len__(self) -> int:
+        """Return the number of distinct questions in the index."""
+        return len(self.questions)
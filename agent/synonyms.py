@@ -0,0 +1,81 @@
+"""
+Synonym Normalizer Module
+Collapses acronyms and their long-form aliases onto a single canonical term.
+"""
+
+import re
+from typing import Dict, List, Optional
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class SynonymNormalizer:
+    """
+    Rewrites known aliases (e.g. "eligibility verification agent") to their
+    canonical term (e.g. "eva") using a single precompiled regular expression.
+    """
+
+    def __init__(self, synonyms: Optional[Dict[str, List[str]]] = None):
+        """
+        Initialize the normalizer.
+
+        Args:
+            synonyms: Mapping of canonical term to the list of aliases that
+                should be rewritten to it
+
+        Raises:
+            ValueError: If an alias is mapped to more than one canonical term
+        """
+        self.replacements: Dict[str, str] = {}
+
+        for canonical, aliases in (synonyms or {}).items():
+            canonical = canonical.lower().strip()
+            for alias in aliases:
+                alias = " ".join(alias.lower().split())
+                if not alias or alias == canonical:
+                    continue
+                existing = self.replacements.get(alias)
+                if existing is not None and existing != canonical:
+                    raise ValueError(
+                        f"Alias '{alias}' maps to both '{existing}' and '{canonical}'"
+                    )
+                self.replacements[alias] = canonical
+
+        # Longest aliases first so "claims processing agent" wins over "claims processing"
+        if self.replacements:
+            alternatives = sorted(self.replacements, key=len, reverse=True)
+            pattern = "|".join(
+                r"\s+".join(re.escape(word) for word in alias.split())
+                for alias in alternatives
+            )
+            self._pattern = re.compile(rf"\b(?:{pattern})\b", re.IGNORECASE)
+        else:
+            self._pattern = None
+
+        logger.info(f"Initialized synonym normalizer with {len(self.replacements)} aliases")
+
+    def normalize(self, text: str) -> str:
+        """
+        Lowercase text and rewrite every known alias to its canonical term.
+
+        Args:
+            text: Question text to normalize
+
+        Returns:
+            Normalized text
+        """
+        text = text.lower().strip()
+        if self._pattern is None:
+            return text
+        return self._pattern.sub(self._replace, text)
+
+    def _replace(self, match: "re.Match") -> str:
+        """Return the canonical term for a matched alias."""
+        return self.replacements[" ".join(match.group(0).split())]
+
+    def __len__(self) -> int:
+        """Return the number of aliases."""
+        return len(self.replacements)
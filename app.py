@@ -4,9 +4,11 @@ A conversational AI agent for answering questions about Thoughtful AI's healthca
 """
 
 import streamlit as st
+import atexit
 import os
 from pathlib import Path
 from agent.knowledge_base import KnowledgeBase
+from agent.profiler import RequestProfiler
 from agent.responder import ThoughtfulAIResponder
 
 # Page configuration
@@ -50,6 +52,35 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+@st.cache_resource
+def load_profiler():
+    """
+    Build the process-wide request profiler, if enabled via AGENT_PROFILE_* variables.
+
+    A single instance owns the output file, and its final interval is flushed at exit.
+    """
+    profiler = RequestProfiler.from_env()
+    if profiler is not None:
+        atexit.register(profiler.close)
+    return profiler
+
+
+@st.cache_resource
+def load_responder(kb_path: str) -> ThoughtfulAIResponder:
+    """
+    Build the responder once per process and share it across sessions.
+
+    The suggestion index lives on the responder, so sharing it makes
+    typeahead popularity global rather than per browser session.
+    """
+    kb = KnowledgeBase(kb_path)
+    return ThoughtfulAIResponder(
+        kb,
+        similarity_threshold=0.4,
+        profiler=load_profiler()
+    )
+
+
 def initialize_agent():
     """Initialize the AI agent with knowledge base."""
     try:
@@ -61,11 +92,8 @@ def initialize_agent():
             st.error(f"❌ Knowledge base not found at: {kb_path}")
             st.stop()
 
-        # Load knowledge base and create responder
-        kb = KnowledgeBase(str(kb_path))
-        responder = ThoughtfulAIResponder(kb, similarity_threshold=0.4)
-
-        return responder
+        # Load knowledge base and create (or reuse) the shared responder
+        return load_responder(str(kb_path))
     except Exception as e:
         st.error(f"❌ Error initializing agent: {str(e)}")
         st.stop()
@@ -123,9 +151,13 @@ def main():
         st.header("💡 Sample Questions")
         st.markdown("Try asking:")
 
-        sample_questions = st.session_state.responder.get_all_sample_questions()
-        for i, question in enumerate(sample_questions[:5], 1):
-            if st.button(f"❓ {question[:50]}...", key=f"sample_{i}", use_container_width=True):
+        # Typeahead: most popular questions when empty, prefix matches otherwise
+        search = st.text_input("🔎 Find a question", key="question_search")
+        sample_questions = st.session_state.responder.suggest(search, k=5)
+        if search and not sample_questions:
+            st.caption("No matching questions - try fewer words.")
+        for i, question in enumerate(sample_questions, 1):
+            if st.button(f"❓ {question}", key=f"sample_{i}", use_container_width=True):
                 st.session_state.pending_question = question
 
         st.divider()
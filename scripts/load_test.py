@@ -0,0 +1,371 @@
+"""
+Load Test Script
+Drives ThoughtfulAIResponder with many concurrent clients and reports
+throughput, tail latency and error rate at increasing concurrency levels.
+
+--mode http runs the stand-in server in the same process (and GIL) as the
+client threads, so its numbers mix client and server contention. For an
+isolated server measurement, run --serve in one process and point --url at
+it from another.
+
+Usage:
+    python scripts/load_test.py                          # in-process, synthetic mix
+    python scripts/load_test.py --mode http              # via a local stand-in server
+    python scripts/load_test.py --serve --port 8000      # stand-in server only, blocks until Ctrl+C
+    python scripts/load_test.py --url http://host:port/ask   # against a separate server process
+    python scripts/load_test.py --replay queries.log     # replay a recorded query log
+"""
+
+import argparse
+import json
+import logging
+import math
+import random
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agent.knowledge_base import KnowledgeBase  # noqa: E402
+from agent.responder import ThoughtfulAIResponder  # noqa: E402
+
+DEFAULT_KB_PATH = Path(__file__).resolve().parent.parent / "data" / "knowledge_base.json"
+
+# Paraphrases of KB questions that should still resolve to a predefined answer
+PARAPHRASED_QUESTIONS = [
+    "Tell me about EVA",
+    "Tell me about CAM",
+    "Tell me about PHIL",
+    "what is CAM",
+    "Tell me what EVA does",
+    "How does payment posting work?",
+    "explain eligibility verification",
+    "what does the claims processing agent do",
+    "why should I use Thoughtful AI agents",
+]
+
+# Questions the agent is expected to answer with the fallback response
+OUT_OF_SCOPE_QUESTIONS = [
+    "What's the weather today?",
+    "Who won the game last night?",
+    "How do I bake sourdough bread?",
+    "What is the capital of France?",
+    "Recommend a good movie",
+    "How tall is Mount Everest?",
+]
+
+Target = Callable[[str], Dict[str, object]]
+
+
+def build_question_pool(kb_questions: List[str], seed: int = 0) -> List[Tuple[str, str]]:
+    """
+    Build a shuffled pool of (category, question) pairs for Zipf sampling.
+
+    Args:
+        kb_questions: Predefined questions, replayed verbatim as exact matches
+        seed: Random seed so popularity ranks are reproducible
+
+    Returns:
+        List of (category, question) tuples; list position is the popularity rank
+    """
+    pool = [("exact", q) for q in kb_questions]
+    pool += [("paraphrased", q) for q in PARAPHRASED_QUESTIONS]
+    pool += [("out_of_scope", q) for q in OUT_OF_SCOPE_QUESTIONS]
+    random.Random(seed).shuffle(pool)
+    return pool
+
+
+def zipf_sample(pool: List[Tuple[str, str]], num_requests: int, exponent: float = 1.1,
+                seed: int = 0) -> List[Tuple[str, str]]:
+    """
+    Draw questions from the pool with Zipf-distributed popularity.
+
+    Args:
+        pool: Candidate (category, question) pairs ordered by rank
+        num_requests: Number of questions to draw
+        exponent: Zipf exponent; larger values concentrate traffic on the head
+        seed: Random seed
+
+    Returns:
+        List of sampled (category, question) tuples
+    """
+    weights = [1.0 / (rank ** exponent) for rank in range(1, len(pool) + 1)]
+    return random.Random(seed).choices(pool, weights=weights, k=num_requests)
+
+
+def load_query_log(log_path: str, num_requests: Optional[int] = None) -> List[Tuple[str, str]]:
+    """
+    Load a recorded production query log for replay.
+
+    Each line is either a raw question or a JSON object with a 'question' key.
+
+    Args:
+        log_path: Path to the query log
+        num_requests: If given, cycle or truncate the log to this many queries
+
+    Returns:
+        List of ('replay', question) tuples in recorded order
+
+    Raises:
+        ValueError: If the log contains no questions
+    """
+    queries = []
+    with open(log_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('{'):
+                line = json.loads(line).get('question', '')
+            queries.append(("replay", line))
+
+    if not queries:
+        raise ValueError(f"No questions found in query log: {log_path}")
+
+    if num_requests is not None:
+        queries = [queries[i % len(queries)] for i in range(num_requests)]
+    return queries
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+
+    Args:
+        sorted_values: Values in ascending order
+        pct: Percentile (0-100)
+
+    Returns:
+        The percentile value, or 0.0 for an empty list
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def run_level(target: Target, queries: List[Tuple[str, str]], concurrency: int) -> Dict[str, float]:
+    """
+    Replay queries against the target from concurrent client threads.
+
+    Args:
+        target: Callable taking a question and returning a response dict
+        queries: (category, question) pairs to send
+        concurrency: Number of simultaneous clients
+
+    Returns:
+        Dictionary with throughput, latency percentiles (ms) and error rate
+    """
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def client(batch: List[Tuple[str, str]]) -> None:
+        nonlocal errors
+        local_latencies = []
+        local_errors = 0
+        for _, question in batch:
+            start = time.perf_counter()
+            try:
+                response = target(question)
+                if response.get('source') == 'error':
+                    local_errors += 1
+            except Exception:
+                local_errors += 1
+            local_latencies.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local_latencies)
+            errors += local_errors
+
+    batches = [queries[i::concurrency] for i in range(concurrency)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(client, batches))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'concurrency': concurrency,
+        'requests': len(queries),
+        'throughput_rps': len(queries) / elapsed if elapsed > 0 else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'p999_ms': percentile(latencies, 99.9) * 1000,
+        'error_rate': errors / len(queries) if queries else 0.0,
+    }
+
+
+def start_server(responder: ThoughtfulAIResponder, host: str = "127.0.0.1",
+                 port: int = 0) -> ThreadingHTTPServer:
+    """
+    Start a local stand-in HTTP server in a background thread.
+
+    The server answers POST /ask with a JSON body {"question": ...} using
+    the responder's get_response() output.
+
+    Args:
+        responder: Responder to serve
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+
+    Returns:
+        The running server; call shutdown() when done
+    """
+
+    class AskHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != '/ask':
+                self.send_error(404)
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                question = json.loads(self.rfile.read(length) or b'{}').get('question', '')
+                body = json.dumps(responder.get_response(question)).encode('utf-8')
+                self.send_response(200)
+            except Exception as e:
+                body = json.dumps({'error': str(e)}).encode('utf-8')
+                self.send_response(500)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    class LoadTestServer(ThreadingHTTPServer):
+        # The default listen backlog of 5 shows up as connect-retry tail latency
+        request_queue_size = 1024
+
+    server = LoadTestServer((host, port), AskHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def http_target(url: str, timeout: float = 10.0) -> Target:
+    """
+    Build a target that posts questions to a responder server.
+
+    Args:
+        url: Full URL of the /ask endpoint
+        timeout: Per-request timeout in seconds
+
+    Returns:
+        Callable taking a question and returning the decoded response
+    """
+
+    def send(question: str) -> Dict[str, object]:
+        data = json.dumps({'question': question}).encode('utf-8')
+        request = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())
+
+    return send
+
+
+def format_report(results: List[Dict[str, float]]) -> str:
+    """Format per-level results as a fixed-width table."""
+    lines = [
+        f"{'clients':>8} {'requests':>9} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'p999 ms':>9} {'errors':>8}",
+        "-" * 68,
+    ]
+    for r in results:
+        lines.append(
+            f"{r['concurrency']:>8} {r['requests']:>9} {r['throughput_rps']:>10.1f} "
+            f"{r['p50_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['p999_ms']:>9.2f} {r['error_rate']:>8.2%}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Concurrent load test for ThoughtfulAIResponder")
+    parser.add_argument('--mode', choices=['inprocess', 'http'], default='inprocess',
+                        help="Call the responder directly or through a local HTTP server "
+                             "(same process and GIL as the clients)")
+    parser.add_argument('--url', help="Existing /ask endpoint to target (implies --mode http)")
+    parser.add_argument('--serve', action='store_true',
+                        help="Only run the stand-in /ask server until interrupted, for --url "
+                             "clients in another process")
+    parser.add_argument('--host', default="127.0.0.1", help="Interface for --serve")
+    parser.add_argument('--port', type=int, default=8000, help="Port for --serve (0 picks a free port)")
+    parser.add_argument('--kb', default=str(DEFAULT_KB_PATH), help="Knowledge base JSON path")
+    parser.add_argument('--threshold', type=float, default=0.4, help="Similarity threshold")
+    parser.add_argument('--concurrency', default="1,4,16,64",
+                        help="Comma-separated client counts to step through")
+    parser.add_argument('--requests', type=int, default=None,
+                        help="Requests per concurrency level (default: 2000 for the synthetic "
+                             "mix, the whole log with --replay)")
+    parser.add_argument('--zipf', type=float, default=1.1, help="Zipf exponent for the synthetic mix")
+    parser.add_argument('--replay', help="Replay a recorded query log instead of the synthetic mix")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed")
+    parser.add_argument('--log-level', default='WARNING',
+                        help="Agent log level; INFO includes per-request logging contention")
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    args = parser.parse_args(argv)
+    if args.serve and args.url:
+        parser.error("--serve and --url are mutually exclusive")
+
+    logging.getLogger().setLevel(args.log_level.upper())
+    for name in ('agent.knowledge_base', 'agent.matcher', 'agent.responder', 'agent.synonyms'):
+        logging.getLogger(name).setLevel(args.log_level.upper())
+
+    server = None
+    kb = KnowledgeBase(args.kb)
+    if args.serve:
+        server = start_server(ThoughtfulAIResponder(kb, similarity_threshold=args.threshold),
+                              args.host, args.port)
+        host, port = server.server_address[:2]
+        print(f"Serving POST http://{host}:{port}/ask (Ctrl+C to stop)", flush=True)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.shutdown()
+        return 0
+
+    if args.url:
+        target = http_target(args.url)
+    else:
+        responder = ThoughtfulAIResponder(kb, similarity_threshold=args.threshold)
+        if args.mode == 'http':
+            server = start_server(responder)
+            host, port = server.server_address[:2]
+            target = http_target(f"http://{host}:{port}/ask")
+        else:
+            target = responder.get_response
+
+    if args.replay:
+        queries = load_query_log(args.replay, args.requests)
+    else:
+        pool = build_question_pool(kb.get_all_questions(), seed=args.seed)
+        num_requests = args.requests if args.requests is not None else 2000
+        queries = zipf_sample(pool, num_requests, exponent=args.zipf, seed=args.seed)
+
+    try:
+        results = [
+            run_level(target, queries, int(level))
+            for level in args.concurrency.split(',') if level.strip()
+        ]
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(format_report(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Test knowledge base duplicate and conflict detection
+"""
+
+import json
+import random
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+from agent.kb_lint import find_near_duplicates, lint_knowledge_base, main, merge_duplicates
+from agent.matcher import QuestionMatcher
+
+QA_PAIRS = [
+    {"question": "What does EVA do?", "answer": "eva"},
+    {"question": "what does eva do?", "answer": "eva"},
+    {"question": "How does CAM work?", "answer": "cam"},
+    {"question": "How does CAM work?", "answer": "something else"},
+    {"question": "What does the EVA agent do?", "answer": "eva"},
+    {"question": "How does PHIL post payments?", "answer": "phil"},
+]
+
+
+def build_matcher(qa_pairs):
+    """Fit a matcher over the given pairs."""
+    return QuestionMatcher([qa['question'] for qa in qa_pairs], [qa['answer'] for qa in qa_pairs])
+
+
+def test_chunked_matches_full_similarity():
+    """Chunked results equal a brute-force scan of the full matrix."""
+    matcher = build_matcher(QA_PAIRS)
+    full = cosine_similarity(matcher.question_vectors)
+    expected = {
+        (i, j) for i in range(len(QA_PAIRS)) for j in range(i + 1, len(QA_PAIRS))
+        if full[i, j] >= 0.5 - 1e-9
+    }
+    for chunk_size in (1, 2, 100):
+        pairs = find_near_duplicates(matcher.question_vectors, cutoff=0.5, chunk_size=chunk_size)
+        assert {(p['first'], p['second']) for p in pairs} == expected
+        assert [p['score'] for p in pairs] == sorted((p['score'] for p in pairs), reverse=True)
+
+
+def test_lint_reports_duplicates_conflicts_and_near_duplicates():
+    """Identical text is grouped; differing answers are flagged."""
+    report = lint_knowledge_base(build_matcher(QA_PAIRS), cutoff=0.5)
+    assert report['duplicates'] == [[0, 1]]
+    assert report['conflicts'] == [[2, 3]]
+    near = {(p['first'], p['second']): p['same_answer'] for p in report['near_duplicates']}
+    assert near[(0, 4)] is True
+    assert (0, 1) not in near and (2, 3) not in near
+
+
+def test_merge_keeps_first_and_conflicts():
+    """Same-answer duplicates collapse onto the first entry; conflicts stay."""
+    report = lint_knowledge_base(build_matcher(QA_PAIRS), cutoff=0.5)
+    merged = merge_duplicates(QA_PAIRS, report)
+    assert [qa['question'] for qa in merged] == [
+        "What does EVA do?", "How does CAM work?", "How does CAM work?", "How does PHIL post payments?"
+    ]
+
+
+def test_cli_writes_merged_kb(tmp_path):
+    """The CLI exits non-zero on conflicts and preserves other KB keys."""
+    kb_path = tmp_path / "kb.json"
+    out_path = tmp_path / "merged.json"
+    kb_path.write_text(json.dumps({"questions": QA_PAIRS, "synonyms": {"eva": ["eligibility"]}}))
+
+    assert main([str(kb_path), "--cutoff", "0.5", "--write", str(out_path)]) == 1
+    merged = json.loads(out_path.read_text())
+    assert len(merged['questions']) == 4
+    assert merged['synonyms'] == {"eva": ["eligibility"]}
+
+
+def test_rejects_bad_cutoff():
+    """Cutoff must be in (0, 1]."""
+    with pytest.raises(ValueError):
+        find_near_duplicates(np.eye(2), cutoff=0.0)
+
+
+def test_overlapping_vocabulary_matches_brute_force():
+    """Shared domain terms, rare terms and common-only rows all match a full scan."""
+    rng = random.Random(0)
+    domain = ["eligibility", "verification", "claims", "processing", "payment", "posting",
+              "agent", "patient", "benefits", "reimbursement", "accounts", "automation"]
+    rare = [f"rare{i}" for i in range(300)]
+    questions = [" ".join(rng.sample(domain, 6) + rng.choices(rare, k=3)) for _ in range(600)]
+    questions += [q + " " + rng.choice(rare) for q in questions[:60]]
+    questions += [" ".join(rng.sample(domain, 4)) for _ in range(80)]
+    vectors = TfidfVectorizer().fit_transform(questions)
+
+    full = np.triu(cosine_similarity(vectors), 1)
+    for cutoff in (0.6, 0.9):
+        expected = set(zip(*map(np.ndarray.tolist, np.nonzero(full >= cutoff - 1e-9))))
+        assert expected
+        for options in ({}, {'chunk_size': 37, 'max_nnz': 500}, {'common_df': 3}, {'common_df': 10 ** 9}):
+            pairs = find_near_duplicates(vectors, cutoff=cutoff, **options)
+            assert {(p['first'], p['second']) for p in pairs} == expected
+
+
+def test_common_term_questions_match_brute_force(caplog):
+    """Questions made only of domain words are paired through shared cores, or compared in full past the cap."""
+    rng = random.Random(1)
+    domain = [f"word{i}" for i in range(20)]
+    questions = [" ".join(rng.sample(domain, rng.randrange(3, 8))) for _ in range(700)]
+    questions += [" ".join(rng.choices(domain, k=6)) for _ in range(100)]
+    questions += questions[:50]
+    vectors = TfidfVectorizer().fit_transform(questions)
+
+    full = np.triu(cosine_similarity(vectors), 1)
+    for cutoff in (0.7, 0.9):
+        expected = set(zip(*map(np.ndarray.tolist, np.nonzero(full >= cutoff - 1e-9))))
+        for options in ({}, {'max_nnz': 500}, {'max_signatures': 2}):
+            pairs = find_near_duplicates(vectors, cutoff=cutoff, **options)
+            assert {(p['first'], p['second']) for p in pairs} == expected
+    assert "comparing them against all common-term rows" in caplog.text
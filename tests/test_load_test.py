@@ -0,0 +1,89 @@
+"""
+Test the concurrent load test helpers
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+from agent.knowledge_base import KnowledgeBase
+from agent.responder import ThoughtfulAIResponder
+from scripts.load_test import (
+    build_question_pool, http_target, load_query_log, main, percentile,
+    run_level, start_server, zipf_sample
+)
+
+KB_PATH = Path(__file__).parent.parent / "data" / "knowledge_base.json"
+SCRIPT_PATH = Path(__file__).parent.parent / "scripts" / "load_test.py"
+
+
+def test_percentile_nearest_rank():
+    """Nearest-rank percentiles on a sorted list."""
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile(values, 99.9) == 100.0
+    assert percentile([], 50) == 0.0
+
+
+def test_zipf_sample_favors_head():
+    """The top-ranked question is drawn more often than the tail."""
+    pool = build_question_pool(["q1", "q2", "q3"], seed=1)
+    sample = zipf_sample(pool, 2000, seed=1)
+    assert len(sample) == 2000
+    assert sample.count(pool[0]) > sample.count(pool[-1])
+    assert {category for category, _ in pool} == {"exact", "paraphrased", "out_of_scope"}
+
+
+def test_load_query_log_cycles(tmp_path):
+    """Raw and JSON lines are replayed in order and cycled to the request count."""
+    log = tmp_path / "queries.log"
+    log.write_text('Tell me about EVA\n\n{"question": "weather"}\n', encoding='utf-8')
+    queries = load_query_log(str(log), num_requests=3)
+    assert [q for _, q in queries] == ["Tell me about EVA", "weather", "Tell me about EVA"]
+
+
+def test_replay_uses_whole_log_by_default(tmp_path, capsys):
+    """--replay sends every logged query unless --requests is given."""
+    log = tmp_path / "queries.log"
+    log.write_text("".join(f"question {i}\n" for i in range(2500)), encoding='utf-8')
+
+    main(["--replay", str(log), "--concurrency", "2", "--json"])
+    assert json.loads(capsys.readouterr().out)[0]['requests'] == 2500
+
+    main(["--replay", str(log), "--concurrency", "2", "--requests", "10", "--json"])
+    assert json.loads(capsys.readouterr().out)[0]['requests'] == 10
+
+
+def test_run_level_in_process_and_http():
+    """Both in-process and HTTP targets complete without errors."""
+    responder = ThoughtfulAIResponder(KnowledgeBase(str(KB_PATH)), similarity_threshold=0.4)
+    queries = zipf_sample(build_question_pool(responder.get_all_sample_questions()), 40)
+
+    result = run_level(responder.get_response, queries, concurrency=4)
+    assert result['requests'] == 40 and result['error_rate'] == 0.0
+    assert result['p50_ms'] <= result['p99_ms'] <= result['p999_ms']
+
+    server = start_server(responder)
+    try:
+        host, port = server.server_address[:2]
+        result = run_level(http_target(f"http://{host}:{port}/ask"), queries, concurrency=4)
+        assert result['error_rate'] == 0.0
+    finally:
+        server.shutdown()
+
+
+def test_serve_in_separate_process(capsys):
+    """--serve runs a standalone server that --url clients can drive from another process."""
+    server = subprocess.Popen([sys.executable, str(SCRIPT_PATH), "--serve", "--port", "0"],
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    try:
+        url = server.stdout.readline().split()[2]
+        assert url.endswith("/ask")
+
+        main(["--url", url, "--concurrency", "2", "--requests", "20", "--json"])
+        result = json.loads(capsys.readouterr().out)[0]
+        assert result['requests'] == 20 and result['error_rate'] == 0.0
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
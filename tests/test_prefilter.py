@@ -0,0 +1,34 @@
+"""
+Test the out-of-vocabulary prefilter in the matcher
+"""
+
+from agent.matcher import QuestionMatcher
+
+
+def build_matcher():
+    """Fit a small matcher."""
+    return QuestionMatcher(
+        ["What does EVA do?", "Tell me about CAM"],
+        ["eva answer", "cam answer"],
+        threshold=0.4
+    )
+
+
+def test_known_terms_detection():
+    """Only queries with a fitted, non-stop-word term pass the prefilter."""
+    matcher = build_matcher()
+    assert matcher.has_known_terms("will it rain today?") is False
+    assert matcher.has_known_terms("what is the") is False
+    assert matcher.has_known_terms("is cam any good") is True
+    for term in matcher.vectorizer.vocabulary_:
+        assert matcher.has_known_terms(f"weather {term}") is True
+
+
+def test_matcher_rejects_out_of_vocabulary_query():
+    """Off-topic queries score 0; exact and in-vocabulary queries still match."""
+    matcher = build_matcher()
+    assert matcher.find_best_match("Will it rain today?") == (None, 0.0, None)
+    assert matcher.find_best_match("what does eva do?") == ("eva answer", 1.0, "What does EVA do?")
+
+    answer, confidence, _ = matcher.find_best_match("tell me about cam please")
+    assert answer == "cam answer" and confidence >= 0.4
@@ -0,0 +1,93 @@
+"""
+Test the opt-in request profiler
+"""
+
+import threading
+import time
+from pathlib import Path
+from agent.knowledge_base import KnowledgeBase
+from agent.profiler import RequestProfiler
+from agent.responder import ThoughtfulAIResponder
+
+KB_PATH = Path(__file__).parent.parent / "data" / "knowledge_base.json"
+
+
+def test_sampled_requests_produce_folded_stacks(tmp_path):
+    """Traced requests are aggregated and dumped as folded stacks."""
+    output = tmp_path / "responder.folded"
+    profiler = RequestProfiler(sample_rate=1.0, output_path=str(output))
+    responder = ThoughtfulAIResponder(KnowledgeBase(str(KB_PATH)), similarity_threshold=0.4, profiler=profiler)
+
+    response = responder.get_response("How does payment posting work?")
+    assert response['source'] == 'predefined'
+    profiler.close()
+
+    lines = output.read_text(encoding='utf-8').splitlines()
+    assert profiler.profiled_requests == 1
+    assert any("QuestionMatcher.find_best_match" in line for line in lines)
+    for line in lines:
+        stack, value = line.rsplit(" ", 1)
+        assert stack.startswith("responder.py:ThoughtfulAIResponder._generate_response")
+        assert int(value) > 0
+
+
+def slow_call():
+    """Stand-in for a slow request."""
+    time.sleep(0.1)
+
+
+def test_latency_threshold_keeps_only_slow_requests():
+    """Stack samples are kept for slow calls and dropped for fast ones."""
+    profiler = RequestProfiler(latency_threshold_ms=20, sample_interval_ms=1)
+    try:
+        profiler.call(lambda: None)
+        assert profiler.profiled_requests == 0
+
+        profiler.call(slow_call)
+        assert profiler.profiled_requests == 1
+        assert profiler.folded().startswith("test_profiler.py:slow_call ")
+    finally:
+        profiler.close()
+
+
+def test_disabled_by_default(monkeypatch, tmp_path):
+    """No profiler is built unless the environment asks for one."""
+    monkeypatch.delenv('AGENT_PROFILE_SAMPLE_RATE', raising=False)
+    monkeypatch.delenv('AGENT_PROFILE_LATENCY_MS', raising=False)
+    assert RequestProfiler.from_env() is None
+
+    output = tmp_path / "responder.folded"
+    monkeypatch.setenv('AGENT_PROFILE_SAMPLE_RATE', '0.25')
+    monkeypatch.setenv('AGENT_PROFILE_OUTPUT', str(output))
+    profiler = RequestProfiler.from_env()
+    try:
+        assert profiler.sample_rate == 0.25 and profiler.latency_threshold_ms is None
+        assert profiler.output_path == str(output)
+    finally:
+        profiler.close()
+    assert not profiler._worker.is_alive()
+
+
+def test_periodic_dump_runs_in_background(tmp_path):
+    """Sample-rate-only mode dumps from the background thread, not the request."""
+    output = tmp_path / "responder.folded"
+    profiler = RequestProfiler(sample_rate=1.0, output_path=str(output), dump_interval_s=0.05)
+    dump_threads = []
+    original_dump = profiler.dump
+
+    def recording_dump(path=None):
+        dump_threads.append(threading.current_thread())
+        return original_dump(path)
+
+    profiler.dump = recording_dump
+    try:
+        profiler.call(slow_call)
+        deadline = time.monotonic() + 2
+        while time.monotonic() < deadline:
+            if output.exists() and "test_profiler.py:slow_call" in output.read_text(encoding='utf-8'):
+                break
+            time.sleep(0.01)
+        assert "test_profiler.py:slow_call" in output.read_text(encoding='utf-8')
+    finally:
+        profiler.close()
+    assert dump_threads and all(t is profiler._worker for t in dump_threads[:-1])
@@ -0,0 +1,108 @@
+"""
+Test the typeahead suggestion index
+"""
+
+import random
+import time
+from pathlib import Path
+from agent.knowledge_base import KnowledgeBase
+from agent.responder import ThoughtfulAIResponder
+from agent.suggester import SuggestionIndex
+
+KB_PATH = Path(__file__).parent.parent / "data" / "knowledge_base.json"
+
+QUESTIONS = [
+    "What does EVA do?",
+    "What does CAM do?",
+    "How does payment posting work?",
+    "Tell me about payment reconciliation",
+]
+
+
+def test_prefix_ranked_by_popularity():
+    """Whole-question prefix matches come back most popular first."""
+    index = SuggestionIndex(QUESTIONS, popularity=[1, 5, 0, 0])
+    assert index.suggest("what does", k=2) == ["What does CAM do?", "What does EVA do?"]
+    assert index.suggest("WHAT  does e") == ["What does EVA do?"]
+    assert index.suggest("", k=1) == ["What does CAM do?"]
+
+
+def test_token_prefix_fills_after_full_prefix():
+    """Questions with a word starting with the last typed word follow prefix matches."""
+    index = SuggestionIndex(QUESTIONS)
+    assert set(index.suggest("pay")) == {
+        "How does payment posting work?", "Tell me about payment reconciliation"
+    }
+    assert index.suggest("payment rec") == ["Tell me about payment reconciliation"]
+    assert index.suggest("weather") == []
+
+
+def test_record_hit_reorders():
+    """Recorded hits promote a question."""
+    index = SuggestionIndex(QUESTIONS)
+    assert index.suggest("what", k=1) == ["What does CAM do?"]
+    index.record_hit("what does eva do?", weight=3)
+    assert index.suggest("what", k=1) == ["What does EVA do?"]
+
+
+def test_responder_suggest_tracks_matches():
+    """Answered questions become the top suggestion."""
+    responder = ThoughtfulAIResponder(KnowledgeBase(str(KB_PATH)), similarity_threshold=0.4)
+    response = responder.get_response("Tell me about CAM")
+    assert responder.suggest("", k=1) == [response['matched_question']]
+
+
+def test_multi_word_query_keeps_recall_on_large_index():
+    """A selective earlier word still finds matches behind many popular prefix hits."""
+    questions = [f"how does step{i} work" for i in range(20000)]
+    questions += [f"what is needle{i} status" for i in range(14)]
+    popularity = [1000] * 20000 + [0] * 14
+    index = SuggestionIndex(questions, popularity)
+
+    # Thousands of more popular 'st...' words precede the few needle questions
+    suggestions = index.suggest("needle3 s", k=5)
+    assert suggestions == ["what is needle3 status"]
+
+    # Both candidate ranges are large and the filter is selective
+    questions += [f"what is stuff{i}" for i in range(20000)] + ["how is stuffing made"]
+    index = SuggestionIndex(questions, popularity + [1000] * 20000 + [0])
+    assert index.suggest("how stu", k=5) == ["how is stuffing made"]
+
+
+def test_multi_word_query_is_fast_on_large_index():
+    """Multi-word queries over common words stay fast and exact at 100k questions."""
+    rng = random.Random(0)
+    openers = ["how does", "what is", "can", "why does", "when does", "how do i", "what does"]
+    subjects = ["the agent", "eva", "cam", "phil", "the claims agent", "thoughtful ai", "the payment agent"]
+    verbs = ["work", "handle", "verify", "process", "post", "reconcile", "submit", "track", "check", "update"]
+    objects = ["claims", "payment status", "eligibility", "denials", "remittance", "benefits",
+               "prior auth", "patient accounts", "appeals", "the claims", "eligibility status"]
+    questions = []
+    for _ in range(100_000):
+        # Opener, subject, verb and ticket number are correlated, so some
+        # combinations of individually common words are rare or absent
+        o, s = rng.randrange(len(openers)), rng.randrange(len(subjects))
+        verb = verbs[(o + s + rng.randrange(3)) % len(verbs)]
+        obj = objects[(3 * o + s + rng.randrange(2)) % len(objects)]
+        questions.append(f"{openers[o]} {subjects[s]} {verb} {obj} w{s * 700 + rng.randrange(700)}")
+    index = SuggestionIndex(questions, [rng.randrange(100) for _ in questions])
+
+    queries = ["how does the agent w4", "claims payment status w1", "what is the claims s",
+               "the payment agent w1", "what is eva a", "phil reconcile d"]
+    for query in queries:
+        *required, last = query.split()
+        expected = sorted(
+            (qid for qid, tokens in enumerate(index.question_tokens)
+             if set(required) <= tokens and any(token.startswith(last) for token in tokens)),
+            key=lambda qid: -index.popularity[qid]
+        )
+        suggestions = index.suggest(query, k=5)
+        assert [index.popularity[index.question_ids[q]] for q in suggestions] == \
+            [index.popularity[qid] for qid in expected[:5]]
+
+    start = time.perf_counter()
+    for _ in range(20):
+        for query in queries:
+            index.suggest(query, k=5)
+    average_ms = (time.perf_counter() - start) * 1000 / (20 * len(queries))
+    assert average_ms < 3.0, f"{average_ms:.2f}ms per multi-word suggestion"